@@ -1,15 +1,23 @@
 # generate_page.py (Integrates Scooore odds, filters qualifiers, highlights value)
 
-import pandas as pd
-from datetime import datetime
+from __future__ import annotations
+from datetime import datetime, timezone
 import os
-import glob
-import pytz
+import sys
+import fnmatch
 import traceback
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 import re # Added for name preprocessing
-from typing import Optional, List, Tuple, Any
+from typing import Optional, List, Tuple, Any, Dict, TYPE_CHECKING
 import html
-import numpy as np # For isnan checks
+
+# pandas/numpy/pyarrow are imported inside the functions that need them, so runs
+# without any data file (error page only) skip their import cost entirely.
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
 
 # --- Constants ---
 ERROR_MESSAGE_CLASS = "error-message"
@@ -35,9 +43,29 @@ DISPLAY_HEADERS = [
     "P1 Odds (Sack.)", "P2 Odds (Sack.)", # Clarify source
     "P1 Odds (Scooore)", "P2 Odds (Scooore)" # Add Scooore headers
 ]
+# Table header row never changes, so it is rendered (and encoded) once at import
+_THEAD_HTML = ('<thead><tr>' + ''.join(f'<th>{html.escape(header)}</th>' for header in DISPLAY_HEADERS) + '</tr></thead>').encode('utf-8')
+
+# Sort keys for named rounds; 'R<n>' rounds sort by n, so the final comes first
+ROUND_SORT_ORDER = {'W': 0, 'F': 1, 'SF': 2, 'QF': 4}
+
+# Free-text columns that need HTML escaping; the formatted number columns are HTML-safe
+HTML_TEXT_COLS = ('TournamentName', 'Round', 'Player1Name', 'Player2Name')
+# Single-pass equivalent of html.escape(quote=True) for the table cells
+_HTML_TRANS = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'})
+# CSS class applied to a Scooore odds cell flagged as a value bet
+VALUE_BET_CLASSES = {'p1_odds': 'value-bet-p1', 'p2_odds': 'value-bet-p2'}
+
+# Explicit schema for the Sackmann CSV columns we actually use (in display order).
+# Only these columns are parsed, and type inference is skipped on them.
+SACKMANN_COLUMN_TYPES = {
+    'TournamentName': 'string', 'Round': 'string',
+    'Player1Name': 'string', 'Player2Name': 'string',
+    'Player1_Match_Prob': 'float32', 'Player2_Match_Prob': 'float32',
+    'Player1_Match_Odds': 'float32', 'Player2_Match_Odds': 'float32',
+}
 
 # --- Helper Functions (preprocess_player_name, find_latest_csv, format_error_html_for_table) ---
-# (These functions remain unchanged from the previous version)
 def preprocess_player_name(name: str) -> str:
     """Standardizes a single player name string."""
     if not isinstance(name, str): return ""
@@ -57,11 +85,16 @@ def find_latest_csv(directory: str, pattern: str) -> Optional[str]:
         search_dir = os.path.join(script_dir, directory)
         search_path = os.path.join(search_dir, pattern)
         print(f"Searching for pattern: {search_path}")
-        list_of_files = glob.glob(search_path)
-        if not list_of_files: return None
-        list_of_files = [f for f in list_of_files if os.path.isfile(f)]
-        if not list_of_files: return None
-        latest_file = max(list_of_files, key=os.path.getmtime)
+        if not os.path.isdir(search_dir): return None
+        # Single directory scan; DirEntry caches the file type and stat results
+        latest_file, latest_mtime = None, -1.0
+        with os.scandir(search_dir) as entries:
+            for entry in entries:
+                if not fnmatch.fnmatchcase(entry.name, pattern) or not entry.is_file(): continue
+                mtime = entry.stat().st_mtime
+                if mtime > latest_mtime:
+                    latest_file, latest_mtime = entry.path, mtime
+        if latest_file is None: return None
         print(f"Found latest CSV file: {latest_file} (Full path: {os.path.abspath(latest_file)})")
         return latest_file
     except Exception as e:
@@ -69,37 +102,139 @@ def find_latest_csv(directory: str, pattern: str) -> Optional[str]:
         traceback.print_exc()
         return None
 
-def format_error_html_for_table(message: str) -> str:
-    """Formats an error message as an HTML snippet."""
+def _pyarrow_available() -> bool:
+    """True if the optional pyarrow dependency can be imported."""
+    try:
+        import pyarrow
+        return True
+    except ImportError: # Without pyarrow the Sackmann CSV is read with pandas
+        return False
+
+def _arrow_column_types() -> Dict[str, Any]:
+    """SACKMANN_COLUMN_TYPES as pyarrow types."""
+    import pyarrow as pa
+    return {col: pa.type_for_alias(type_name) for col, type_name in SACKMANN_COLUMN_TYPES.items()}
+
+def read_sackmann_table(filepath: str) -> pa.Table:
+    """Reads the Sackmann display columns from a CSV file into an Arrow table."""
+    import pyarrow.csv as pv
+    convert_options = pv.ConvertOptions(
+        include_columns=list(SACKMANN_COLUMN_TYPES),
+        column_types=_arrow_column_types(),
+        strings_can_be_null=True, # Keep empty cells as NaN, like pd.read_csv
+    )
+    return pv.read_csv(filepath, convert_options=convert_options)
+
+def is_output_up_to_date(output_filepath: str, input_filepaths: List[str]) -> bool:
+    """
+    Returns True if the output file exists and its mtime is at least one second
+    newer than the mtime of every input file.
+    """
+    if not os.path.exists(output_filepath): return False
+    output_mtime = os.path.getmtime(output_filepath)
+    return all(output_mtime >= os.path.getmtime(path) + 1 for path in input_filepaths)
+
+def write_file_atomically(filepath: str, data: bytes) -> None:
+    """
+    Writes the bytes to a temp file next to `filepath`, fsyncs it and renames it over
+    `filepath`, so a crash mid-write never leaves a truncated file behind.
+    """
+    tmp_filepath = filepath + '.tmp'
+    try:
+        fd = os.open(tmp_filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            remaining = memoryview(data)
+            while remaining: # A regular file normally takes everything in one write()
+                remaining = remaining[os.write(fd, remaining):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_filepath, filepath)
+    except Exception:
+        try: os.unlink(tmp_filepath)
+        except OSError: pass
+        raise
+
+def _round_sort_key(round_label: Any) -> float:
+    """Numeric sort key for a round label ('R32' -> 32, 'QF' -> 4, ...), NaN if unknown."""
+    if not isinstance(round_label, str): return float('nan')
+    if round_label in ROUND_SORT_ORDER: return ROUND_SORT_ORDER[round_label]
+    round_number = round_label.replace('R', '')
+    return float(round_number) if round_number.isdigit() else float('nan')
+
+def _to_float_array(values: pd.Series) -> np.ndarray:
+    """Coerces a Series to a float64 ndarray, with NaN for missing/invalid entries."""
+    import numpy as np
+    import pandas as pd
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+def _format_float_array(values: np.ndarray, fmt: str) -> np.ndarray:
+    """Formats the non-NaN entries of a float array with a %-style format. NaNs become '-'."""
+    import numpy as np
+    formatted = np.full(values.shape, '-', dtype=object)
+    valid = ~np.isnan(values)
+    formatted[valid] = [fmt % v for v in values[valid].tolist()]
+    return formatted
+
+def _fmt_pct(values: np.ndarray) -> np.ndarray:
+    """Formats probabilities as e.g. '57.3%'."""
+    return _format_float_array(values, '%.1f%%')
+
+def _fmt_odds(values: np.ndarray) -> np.ndarray:
+    """Formats decimal odds as e.g. '1.75'."""
+    return _format_float_array(values, '%.2f')
+
+def format_error_html_for_table(message: str) -> bytes:
+    """Formats an error message as a UTF-8 encoded HTML snippet."""
     print(f"Error generating table: {message}")
-    return f'<div class="{ERROR_MESSAGE_CLASS}" style="padding: 20px;">{html.escape(message)} Check logs for details.</div>'
+    return f'<div class="{ERROR_MESSAGE_CLASS}" style="padding: 20px;">{html.escape(message)} Check logs for details.</div>'.encode('utf-8')
 
 # --- Data Loading Functions (load_and_prepare_sackmann_data, load_and_prepare_scooore_data) ---
-# (These functions remain unchanged from the previous version)
 def load_and_prepare_sackmann_data(csv_filepath: str) -> Optional[pd.DataFrame]:
     """Loads, preprocesses (already done mostly), and filters Sackmann data."""
+    import numpy as np
+    import pandas as pd
     abs_csv_filepath = os.path.abspath(csv_filepath)
     print(f"Loading Sackmann data from: {abs_csv_filepath}")
     if not os.path.exists(csv_filepath) or os.path.getsize(csv_filepath) == 0: return None
     try:
-        df = pd.read_csv(csv_filepath)
-        if df.empty: return None
-        print(f"Read {len(df)} rows initially from Sackmann CSV.")
-        df['Player1_Match_Prob'] = pd.to_numeric(df['Player1_Match_Prob'], errors='coerce')
-        df['Player2_Match_Prob'] = pd.to_numeric(df['Player2_Match_Prob'], errors='coerce')
-        original_count_step1 = len(df)
-        df = df[ (df['Player1_Match_Prob'].notna()) & (df['Player1_Match_Prob'] > 0.0) & (df['Player1_Match_Prob'] < 100.0) & (df['Player2_Match_Prob'].notna()) & (df['Player2_Match_Prob'] > 0.0) & (df['Player2_Match_Prob'] < 100.0) ].copy()
+        if _pyarrow_available():
+            import pyarrow.compute as pc
+            table = read_sackmann_table(csv_filepath)
+            if table.num_rows == 0: return None
+            print(f"Read {table.num_rows} rows initially from {os.path.basename(csv_filepath)}.")
+            original_count_step1 = table.num_rows
+            # Filter on the Arrow table so only surviving rows are converted to pandas
+            p1_prob, p2_prob = table['Player1_Match_Prob'], table['Player2_Match_Prob']
+            mask_p1_valid = pc.and_(pc.is_valid(p1_prob), pc.and_(pc.greater(p1_prob, 0.0), pc.less(p1_prob, 100.0)))
+            mask_p2_valid = pc.and_(pc.is_valid(p2_prob), pc.and_(pc.greater(p2_prob, 0.0), pc.less(p2_prob, 100.0)))
+            df = table.filter(pc.and_(mask_p1_valid, mask_p2_valid)).to_pandas()
+        else:
+            df = pd.read_csv(
+                csv_filepath,
+                usecols=list(SACKMANN_COLUMN_TYPES),
+                dtype={col: (str if type_name == 'string' else type_name) for col, type_name in SACKMANN_COLUMN_TYPES.items()},
+                engine='c', low_memory=False,
+            )
+            if df.empty: return None
+            print(f"Read {len(df)} rows initially from {os.path.basename(csv_filepath)}.")
+            original_count_step1 = len(df)
+            p1_prob, p2_prob = df['Player1_Match_Prob'].to_numpy(), df['Player2_Match_Prob'].to_numpy()
+            with np.errstate(invalid='ignore'): # Comparisons with NaN are False, so NaN rows drop out
+                mask_valid = (p1_prob > 0.0) & (p1_prob < 100.0) & (p2_prob > 0.0) & (p2_prob < 100.0)
+            df = df.take(np.flatnonzero(mask_valid)) # New frame, no extra .copy() needed
         print(f"Filtered Sackmann (Prob = 0%, 100%, NaN): {original_count_step1 - len(df)} rows removed. {len(df)} remain.")
+        # Few distinct values: store as categoricals (sorted categories, small integer codes)
+        df['TournamentName'] = df['TournamentName'].astype('category')
+        df['Round'] = df['Round'].astype('category')
         df['Player1Name'] = df['Player1Name'].astype(str).apply(preprocess_player_name)
         df['Player2Name'] = df['Player2Name'].astype(str).apply(preprocess_player_name)
         original_count_step2 = len(df)
         mask_p1_qualifier = df['Player1Name'].str.contains('Qualifier', case=False, na=False)
         mask_p2_qualifier = df['Player2Name'].str.contains('Qualifier', case=False, na=False)
-        df = df[~(mask_p1_qualifier | mask_p2_qualifier)].copy()
+        df = df.take(np.flatnonzero(~(mask_p1_qualifier | mask_p2_qualifier).to_numpy()))
         print(f"Filtered Sackmann (Qualifiers): {original_count_step2 - len(df)} rows removed. {len(df)} remain.")
         if df.empty: return None
-        sackmann_cols = ['TournamentName', 'Round', 'Player1Name', 'Player2Name', 'Player1_Match_Prob', 'Player2_Match_Prob', 'Player1_Match_Odds', 'Player2_Match_Odds']
-        df = df[[col for col in sackmann_cols if col in df.columns]]
         print(f"Prepared Sackmann data. Shape: {df.shape}")
         return df
     except Exception as e:
@@ -107,6 +242,7 @@ def load_and_prepare_sackmann_data(csv_filepath: str) -> Optional[pd.DataFrame]:
 
 def load_and_prepare_scooore_data(csv_filepath: str) -> Optional[pd.DataFrame]:
     """Loads and preprocesses Scooore data."""
+    import pandas as pd
     abs_csv_filepath = os.path.abspath(csv_filepath)
     print(f"Loading Scooore data from: {abs_csv_filepath}")
     if not os.path.exists(csv_filepath) or os.path.getsize(csv_filepath) == 0: return None
@@ -127,9 +263,9 @@ def load_and_prepare_scooore_data(csv_filepath: str) -> Optional[pd.DataFrame]:
         print(f"Error loading/preparing Scooore data: {e}"); traceback.print_exc(); return None
 
 # --- Merge Function (merge_data) ---
-# (This function remains unchanged from the previous version)
 def merge_data(sackmann_df: pd.DataFrame, scooore_df: Optional[pd.DataFrame]) -> pd.DataFrame:
     """Merges Sackmann and Scooore dataframes."""
+    import pandas as pd
     if scooore_df is None or scooore_df.empty:
         print("Scooore data is missing or empty. Returning only Sackmann data.")
         sackmann_df['p1_odds'] = pd.NA
@@ -162,122 +298,111 @@ def merge_data(sackmann_df: pd.DataFrame, scooore_df: Optional[pd.DataFrame]) ->
 
 # --- HTML Generation ---
 
-def highlight_value_bets(row: pd.Series) -> List[str]:
+def find_value_bets(df: pd.DataFrame) -> Dict[str, np.ndarray]:
     """
-    Applies CSS classes to highlight potential value bets based on odds comparison.
-    Takes a row of the DataFrame as input.
-    Returns a list of CSS class strings, one for each column in the row.
+    Flags potential value bets, where the Scooore odds are at least VALUE_BET_THRESHOLD
+    times the Sackmann odds. Returns a boolean array per Scooore odds column.
+    Rows with missing odds on either side are never flagged.
     """
-    # Default style (no specific class)
-    styles = [''] * len(row.index)
+    import numpy as np
+    with np.errstate(invalid='ignore'):
+        return {
+            'p1_odds': _to_float_array(df['p1_odds']) >= _to_float_array(df['Player1_Match_Odds']) * VALUE_BET_THRESHOLD,
+            'p2_odds': _to_float_array(df['p2_odds']) >= _to_float_array(df['Player2_Match_Odds']) * VALUE_BET_THRESHOLD,
+        }
 
-    # Convert odds to numeric for comparison, handle errors/placeholders
-    try:
-        sack_odds_p1 = pd.to_numeric(row.get('Player1_Match_Odds'), errors='coerce')
-        scooore_odds_p1 = pd.to_numeric(row.get('p1_odds'), errors='coerce')
-        sack_odds_p2 = pd.to_numeric(row.get('Player2_Match_Odds'), errors='coerce')
-        scooore_odds_p2 = pd.to_numeric(row.get('p2_odds'), errors='coerce')
-    except Exception: # Catch any conversion issue
-        return styles # Return default styles if conversion fails
-
-    # Check for P1 value
-    if not pd.isna(sack_odds_p1) and not pd.isna(scooore_odds_p1) and scooore_odds_p1 >= sack_odds_p1 * VALUE_BET_THRESHOLD:
-        try:
-            # Find the index of the 'p1_odds' column (Scooore P1 Odds)
-            p1_odds_idx = row.index.get_loc('p1_odds')
-            styles[p1_odds_idx] = 'value-bet-p1' # Apply class to P1 Scooore cell
-        except KeyError:
-            pass # Column not found
-
-    # Check for P2 value
-    if not pd.isna(sack_odds_p2) and not pd.isna(scooore_odds_p2) and scooore_odds_p2 >= sack_odds_p2 * VALUE_BET_THRESHOLD:
-        try:
-            # Find the index of the 'p2_odds' column (Scooore P2 Odds)
-            p2_odds_idx = row.index.get_loc('p2_odds')
-            styles[p2_odds_idx] = 'value-bet-p2' # Apply class to P2 Scooore cell
-        except KeyError:
-            pass # Column not found
 
-    return styles
+def _escaped_text_cells(values: pd.Series) -> List[bytes]:
+    """
+    HTML-escaped, UTF-8 encoded cell text for a free-text column. Categorical columns
+    are escaped and encoded once per category rather than once per row, with '-' for
+    missing values.
+    """
+    import numpy as np
+    import pandas as pd
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        escaped_categories = np.array([str(c).translate(_HTML_TRANS).encode('utf-8') for c in values.cat.categories] + [b'-'], dtype=object)
+        return escaped_categories[values.cat.codes.to_numpy()].tolist() # Code -1 -> '-'
+    return [str(v).translate(_HTML_TRANS).encode('utf-8') for v in values.tolist()]
 
 
-def generate_html_table(df: pd.DataFrame) -> str:
+def build_html_table(df_display: pd.DataFrame, value_bets: Dict[str, np.ndarray]) -> bytes:
     """
-    Formats the merged DataFrame, sorts, selects/reorders columns, applies value
-    highlighting, and generates an HTML table string using Pandas Styler.
-    Returns error HTML string on failure.
+    Renders the (already formatted) DISPLAY_COLS_ORDERED columns as a UTF-8 encoded
+    HTML table, in that order regardless of the frame's own column order.
+    Only the free-text columns are escaped. Scooore odds cells flagged in
+    `value_bets` get their value-bet CSS class.
     """
+    td_columns = []
+    for col in DISPLAY_COLS_ORDERED:
+        if col in HTML_TEXT_COLS:
+            values = _escaped_text_cells(df_display[col])
+        else: # Formatted numbers and '-' placeholders
+            values = [str(v).encode('utf-8') for v in df_display[col].tolist()]
+        if col in value_bets:
+            value_td = f'<td class="{VALUE_BET_CLASSES[col]}">'.encode('utf-8')
+            td_columns.append([(value_td if is_value else b'<td>') + v + b'</td>' for v, is_value in zip(values, value_bets[col].tolist())])
+        else:
+            td_columns.append([b'<td>' + v + b'</td>' for v in values])
+    tbody = b''.join(b'<tr>' + b''.join(row) + b'</tr>' for row in zip(*td_columns))
+    return b'<table class="dataframe" border="0">' + _THEAD_HTML + b'<tbody>' + tbody + b'</tbody></table>'
+
+
+def generate_html_table(df: pd.DataFrame) -> bytes:
+    """
+    Sorts and formats the merged DataFrame, applies value highlighting, and
+    generates the UTF-8 encoded HTML table.
+    Returns error HTML on failure.
+    """
+    import numpy as np
+    import pandas as pd
     if df is None or df.empty:
          return format_error_html_for_table("No combined match data available to display.")
 
     try:
-        print("Formatting final merged data for display...")
-        # Keep numeric copies for highlighting logic before formatting for display
-        df_numeric = df.copy()
-        df_numeric['Player1_Match_Odds'] = pd.to_numeric(df_numeric['Player1_Match_Odds'], errors='coerce')
-        df_numeric['Player2_Match_Odds'] = pd.to_numeric(df_numeric['Player2_Match_Odds'], errors='coerce')
-        df_numeric['p1_odds'] = pd.to_numeric(df_numeric['p1_odds'], errors='coerce')
-        df_numeric['p2_odds'] = pd.to_numeric(df_numeric['p2_odds'], errors='coerce')
+        # Check if all necessary display columns exist
+        missing_display_cols = [col for col in DISPLAY_COLS_ORDERED if col not in df.columns]
+        if missing_display_cols:
+            return format_error_html_for_table(f"Data is missing columns needed for display: {', '.join(missing_display_cols)}. Check merge logic and `DISPLAY_COLS_ORDERED` list.")
+
+        try:
+            # Sort by Tournament (missing last), then Round, on the unformatted data.
+            # Categories are sorted, so tournament codes sort like the names themselves.
+            tournament_codes = df['TournamentName'].astype('category').cat.codes.to_numpy()
+            rounds = df['Round'].astype('category')
+            round_keys_by_code = np.array([_round_sort_key(r) for r in rounds.cat.categories] + [np.nan], dtype=np.float64)
+            round_keys = round_keys_by_code[rounds.cat.codes.to_numpy()] # Code -1 (missing) -> NaN
+            df = df.take(np.lexsort((round_keys, tournament_codes, tournament_codes < 0)))
+            print("Sorted matchups by Tournament and Round.")
+        except Exception as e:
+             print(f"Warning: Error during sorting: {e}")
 
+        # Flag value bets while the odds are still numeric
+        value_bets = find_value_bets(df)
 
+        print("Formatting final merged data for display...")
         # --- Apply Display Formatting ---
         # Format probabilities
-        df['Player1_Match_Prob'] = pd.to_numeric(df['Player1_Match_Prob'], errors='coerce').map('{:.1f}%'.format, na_action='ignore')
-        df['Player2_Match_Prob'] = pd.to_numeric(df['Player2_Match_Prob'], errors='coerce').map('{:.1f}%'.format, na_action='ignore')
+        df['Player1_Match_Prob'] = _fmt_pct(_to_float_array(df['Player1_Match_Prob']))
+        df['Player2_Match_Prob'] = _fmt_pct(_to_float_array(df['Player2_Match_Prob']))
         # Format Sackmann odds
-        df['Player1_Match_Odds'] = pd.to_numeric(df['Player1_Match_Odds'], errors='coerce').map('{:.2f}'.format, na_action='ignore')
-        df['Player2_Match_Odds'] = pd.to_numeric(df['Player2_Match_Odds'], errors='coerce').map('{:.2f}'.format, na_action='ignore')
+        df['Player1_Match_Odds'] = _fmt_odds(_to_float_array(df['Player1_Match_Odds']))
+        df['Player2_Match_Odds'] = _fmt_odds(_to_float_array(df['Player2_Match_Odds']))
         # Format Scooore odds
-        df['p1_odds'] = pd.to_numeric(df['p1_odds'], errors='coerce').map('{:.2f}'.format, na_action='ignore')
-        df['p2_odds'] = pd.to_numeric(df['p2_odds'], errors='coerce').map('{:.2f}'.format, na_action='ignore')
-
-        # Fill any remaining NaNs with '-' AFTER formatting
-        df.fillna('-', inplace=True)
+        df['p1_odds'] = _fmt_odds(_to_float_array(df['p1_odds']))
+        df['p2_odds'] = _fmt_odds(_to_float_array(df['p2_odds']))
+
+        # Missing numbers are already '-'; fill text columns only where needed
+        # (missing categoricals become '-' in build_html_table)
+        for col in HTML_TEXT_COLS:
+            if not isinstance(df[col].dtype, pd.CategoricalDtype) and df[col].isna().any():
+                df[col] = df[col].fillna('-')
         print("Data formatting complete.")
 
-        try:
-            # Sort by Tournament and Round
-            df.sort_values(by=['TournamentName', 'Round'], inplace=True, na_position='last', key=lambda x: pd.to_numeric(x.astype(str).str.replace('R','', regex=False).replace('QF','4', regex=False).replace('SF','2', regex=False).replace('F','1', regex=False).replace('W','0', regex=False), errors='coerce') if x.name == 'Round' else x)
-            # Apply the same sort order to the numeric dataframe used for styling
-            df_numeric = df_numeric.loc[df.index]
-            print("Sorted matchups by Tournament and Round.")
-        except Exception as e:
-             print(f"Warning: Error during sorting: {e}")
-
-        # Check if all necessary display columns exist
-        missing_display_cols = [col for col in DISPLAY_COLS_ORDERED if col not in df.columns]
-        if missing_display_cols:
-            return format_error_html_for_table(f"Data is missing columns needed for display: {', '.join(missing_display_cols)}. Check merge logic and `DISPLAY_COLS_ORDERED` list.")
-
-        # Select and reorder columns for the final table
-        df_display = df[DISPLAY_COLS_ORDERED]
-        df_numeric_display = df_numeric[DISPLAY_COLS_ORDERED] # Use this for styling apply
-        df_display.columns = DISPLAY_HEADERS # Set headers on the display version
-
-        # --- Generate HTML table string using Pandas Styler ---
-        print("Applying styles and generating HTML table string using Styler...")
-
-        # Apply the highlighting function row by row (axis=1)
-        # The function returns CSS classes for each cell in the row
-        styler = df_numeric_display.style.apply(highlight_value_bets, axis=1)
-
-        # Apply the display headers to the styler object AFTER applying styles
-        styler.set_table_attributes('class="dataframe"') # Apply base CSS class
-        styler.set_caption(None) # Remove default caption if any
-        # Use the formatted data (df_display) for the actual cell values
-        styler.data = df_display
-
-        # Render HTML
-        html_table = styler.to_html(
-            index=False,         # Don't include DataFrame index
-            escape=True,         # Escape HTML characters
-            na_rep='-',          # Representation for missing values (already applied)
-            border=0             # No default table border
-        )
-
-        if not html_table or not isinstance(html_table, str):
-             return format_error_html_for_table("Failed to generate HTML table using pandas Styler.")
-        print("HTML table string generated successfully via Styler.")
+        # --- Generate HTML table string ---
+        print("Applying value bet highlighting and generating HTML table string...")
+        html_table = build_html_table(df, value_bets) # Picks DISPLAY_COLS_ORDERED by name, no reslice needed
+        print("HTML table string generated successfully.")
         return html_table
 
     except KeyError as e:
@@ -290,12 +415,10 @@ def generate_html_table(df: pd.DataFrame) -> str:
         return format_error_html_for_table(f"Unexpected error during HTML table generation: {type(e).__name__}")
 
 
-def generate_full_html_page(table_content_html: str, timestamp_str: str) -> str:
-    """
-    Constructs the entire HTML page as a string, embedding the table and timestamp.
-    CSS updated for 10 columns and value highlighting.
-    """
-    html_content = f"""<!DOCTYPE html>
+# Static page (CSS for 10 columns and value highlighting), built once at import.
+# generate_full_html_page only fills in the __CONTENT_HASH__, __TABLE__ and __TIMESTAMP__ markers.
+_PAGE_TEMPLATE = f"""<!DOCTYPE html>
+<!-- page-content-hash: __CONTENT_HASH__ -->
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -331,11 +454,11 @@ def generate_full_html_page(table_content_html: str, timestamp_str: str) -> str:
             border-radius: 6px; background-color: var(--white);
             border: 1px solid var(--medium-gray); min-height: 100px; margin-bottom: 20px;
         }}
-        /* Base table style from Pandas Styler */
+        /* Base table style */
         table.dataframe {{
             width: 100%; border-collapse: collapse; margin: 0; font-size: 0.9em;
         }}
-        /* Default cell style from Pandas Styler (overridden by specific classes below) */
+        /* Default cell style (overridden by specific classes below) */
         table.dataframe th, table.dataframe td {{
             border: none; border-bottom: 1px solid var(--medium-gray);
             padding: 10px 12px; text-align: left; vertical-align: middle;
@@ -375,7 +498,7 @@ def generate_full_html_page(table_content_html: str, timestamp_str: str) -> str:
         table.dataframe tbody tr:hover td:nth-child(10) {{ background-color: #d4eaff; }}
 
         /* --- Value Bet Highlighting Styles --- */
-        /* Applied by the Styler to specific TD elements */
+        /* Applied by build_html_table to specific TD elements */
         table.dataframe td.value-bet-p1,
         table.dataframe td.value-bet-p2 {{
             background-color: var(--value-bet-bg-color) !important; /* Override other backgrounds */
@@ -420,17 +543,51 @@ def generate_full_html_page(table_content_html: str, timestamp_str: str) -> str:
     <p>Matches involving qualifiers or appearing completed based on Sackmann data are filtered out. Name matching is performed automatically but may not be perfect.</p>
 
     <div class="table-container">
-        {table_content_html}
+        __TABLE__
     </div>
 
     <div class="last-updated">
-        {timestamp_str}
+        __TIMESTAMP__
     </div>
 
 </body>
 </html>
-"""
-    return html_content
+""".encode('utf-8')
+
+
+CONTENT_HASH_PREFIX = b'<!-- page-content-hash: '
+
+
+def page_content_hash(table_content_html: bytes) -> str:
+    """Hash of everything on the page except the timestamp (template + table)."""
+    content_hash = hashlib.blake2b(_PAGE_TEMPLATE, digest_size=16)
+    content_hash.update(table_content_html)
+    return content_hash.hexdigest()
+
+
+def read_page_content_hash(page_filepath: str) -> Optional[str]:
+    """Returns the content hash embedded in a previously generated page, or None."""
+    try:
+        with open(page_filepath, 'rb') as f:
+            head = f.read(256) # The hash comment sits right after the doctype
+    except OSError:
+        return None
+    start = head.find(CONTENT_HASH_PREFIX)
+    if start < 0: return None
+    start += len(CONTENT_HASH_PREFIX)
+    end = head.find(b' -->', start)
+    return head[start:end].decode('ascii', errors='replace') if end >= 0 else None
+
+
+def generate_full_html_page(table_content_html: bytes, timestamp_str: str, content_hash: str) -> bytes:
+    """
+    Returns the entire HTML page as UTF-8 bytes, embedding the (already encoded)
+    table, the timestamp and the page content hash into the prebuilt page template.
+    """
+    # Table last, so marker-like text inside the table is never substituted
+    return (_PAGE_TEMPLATE.replace(b'__CONTENT_HASH__', content_hash.encode('ascii'))
+            .replace(b'__TIMESTAMP__', timestamp_str.encode('utf-8'))
+            .replace(b'__TABLE__', table_content_html))
 
 
 # --- Main Execution Logic ---
@@ -449,13 +606,24 @@ if __name__ == "__main__":
     latest_sackmann_csv = find_latest_csv(data_dir_abs, SACKMANN_CSV_PATTERN)
     latest_scooore_csv = find_latest_csv(data_dir_abs, SCOOORE_CSV_PATTERN)
 
+    # Skip all work if the page is already newer than its inputs (including this script)
+    if latest_sackmann_csv:
+        input_files = [latest_sackmann_csv, os.path.abspath(__file__)]
+        if latest_scooore_csv: input_files.append(latest_scooore_csv)
+        if is_output_up_to_date(output_file_abs, input_files):
+            print(f"\n{os.path.basename(output_file_abs)} is up to date with the latest data files. Skipping regeneration.")
+            sys.exit(0)
+
     # 2. Load and Prepare Data
-    sackmann_data = None
-    scooore_data = None
+    # The two files are independent and parsing mostly releases the GIL, so read them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        sackmann_future = executor.submit(load_and_prepare_sackmann_data, latest_sackmann_csv) if latest_sackmann_csv else None
+        scooore_future = executor.submit(load_and_prepare_scooore_data, latest_scooore_csv) if latest_scooore_csv else None
+    sackmann_data = sackmann_future.result() if sackmann_future else None
+    scooore_data = scooore_future.result() if scooore_future else None
     error_msg = ""
 
     if latest_sackmann_csv:
-        sackmann_data = load_and_prepare_sackmann_data(latest_sackmann_csv)
         if sackmann_data is None or sackmann_data.empty:
              error_msg += f"Failed to load or prepare valid Sackmann data from {os.path.basename(latest_sackmann_csv)}. "
     else:
@@ -463,7 +631,6 @@ if __name__ == "__main__":
         print(error_msg)
 
     if latest_scooore_csv:
-        scooore_data = load_and_prepare_scooore_data(latest_scooore_csv)
         if scooore_data is None:
              print(f"Warning: Failed to load Scooore data from {os.path.basename(latest_scooore_csv)}. Proceeding without it.")
     else:
@@ -477,31 +644,36 @@ if __name__ == "__main__":
         error_msg = "No upcoming Sackmann matches found after filtering. "
 
     # 4. Generate HTML Table
-    table_html_content = ""
+    table_html_content = b""
     if merged_data is not None and not merged_data.empty:
         print(f"\nGenerating HTML table content from merged data (Shape: {merged_data.shape})...")
-        table_html_content = generate_html_table(merged_data) # Now uses Styler
+        table_html_content = generate_html_table(merged_data)
     else:
         print(f"\nNo data available for table generation. Using error message: {error_msg}")
         final_error_msg = error_msg if error_msg else "Error: No valid match data found or processed."
         table_html_content = format_error_html_for_table(final_error_msg.strip())
 
-    # 5. Generate Full HTML Page
-    update_time = datetime.now(pytz.utc).strftime('%Y-%m-%d %H:%M:%S %Z')
-    timestamp_str = f"Last updated: {html.escape(update_time)}"
-    print("\nGenerating full HTML page content...")
-    full_html = generate_full_html_page(table_html_content, timestamp_str) # Includes value bet CSS
-    print("Full HTML page content generated.")
-
-    # 6. Write HTML to File
-    try:
-        print(f"Writing generated HTML content to: {output_file_abs}")
-        with open(output_file_abs, 'w', encoding='utf-8') as f:
-            f.write(full_html)
-        print(f"Successfully wrote generated HTML to {os.path.basename(output_file_abs)}")
-    except Exception as e:
-        print(f"CRITICAL ERROR writing final HTML file: {e}")
-        traceback.print_exc()
+    # 5. Skip the write if the page content (everything but the timestamp) is unchanged,
+    # so index.html and downstream caches stay untouched
+    content_hash = page_content_hash(table_html_content)
+    if read_page_content_hash(output_file_abs) == content_hash:
+        print(f"\nPage content unchanged since the last run. Leaving {os.path.basename(output_file_abs)} untouched.")
+    else:
+        # 6. Generate Full HTML Page
+        update_time = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S %Z')
+        timestamp_str = f"Last updated: {html.escape(update_time)}"
+        print("\nGenerating full HTML page content...")
+        full_html = generate_full_html_page(table_html_content, timestamp_str, content_hash) # Includes value bet CSS
+        print("Full HTML page content generated.")
+
+        # 7. Write HTML to File
+        try:
+            print(f"Writing generated HTML content to: {output_file_abs}")
+            write_file_atomically(output_file_abs, full_html)
+            print(f"Successfully wrote generated HTML to {os.path.basename(output_file_abs)}")
+        except Exception as e:
+            print(f"CRITICAL ERROR writing final HTML file: {e}")
+            traceback.print_exc()
 
     print("\nPage generation process complete.")
 